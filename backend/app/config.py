@@ -1,14 +1,19 @@
 """Configuration module for the Issue Triage API.
 
 Loads environment-backed settings (database URL, OpenAI models/keys, and timeouts)
-into a Pydantic BaseModel for easy access across the app.
+into a pydantic-settings BaseSettings instance for easy access across the app.
 """
-from pydantic import BaseModel
-import os
+from functools import lru_cache
 
-class Settings(BaseModel):
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class Settings(BaseSettings):
     """Typed application settings sourced from environment variables.
 
+    Field names map to environment variables (case-insensitive); defaults apply
+    when a variable is unset. The instance is frozen so it is hashable and safe
+    to share across the app.
+
     Attributes:
         database_url: SQLAlchemy/psycopg connection string for Postgres.
         openai_api_key: API key for OpenAI; if unset, AI features are disabled.
@@ -16,12 +21,27 @@ class Settings(BaseModel):
         embedding_dim: Dimension of the embedding vectors stored in the DB.
         generation_model: Chat/completions model used to draft replies/answers.
         openai_timeout: Timeout (seconds) for OpenAI API calls.
+        hnsw_ef_search: Per-query candidate list size for the HNSW index;
+            higher values trade latency for recall.
+    """
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", frozen=True)
+
+    database_url: str = "postgresql+psycopg://postgres:postgres@db:5432/triage"
+    openai_api_key: str | None = None
+    embedding_model: str = "text-embedding-3-small"
+    embedding_dim: int = 1536
+    generation_model: str = "gpt-4o-mini"
+    openai_timeout: int = 30
+    hnsw_ef_search: int = 40
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the shared Settings instance, constructed on first use.
+
+    Caching keeps env parsing and validation to a single pass and gives tests a
+    standard FastAPI override point via `Depends(get_settings)`.
     """
-    database_url: str = os.getenv("DATABASE_URL", "postgresql+psycopg://postgres:postgres@db:5432/triage")
-    openai_api_key: str | None = os.getenv("OPENAI_API_KEY")
-    embedding_model: str = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
-    embedding_dim: int = int(os.getenv("EMBEDDING_DIM", "1536"))
-    generation_model: str = os.getenv("GENERATION_MODEL", "gpt-4o-mini")
-    openai_timeout: int = int(os.getenv("OPENAI_TIMEOUT", "30"))
-
-settings = Settings()
\ No newline at end of file
+    return Settings()
+
+
+settings = get_settings()
\ No newline at end of file
@@ -1,35 +1,80 @@
 """Database helpers for the Issue Triage API.
 
-Provides a SQLAlchemy engine and simple query/execute wrappers.
+Provides a pooled async SQLAlchemy engine, a per-request connection dependency,
+and simple query/execute wrappers. The psycopg driver serves both sync and
+async here, so the configured postgresql+psycopg URL needs no change.
 """
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
+from collections.abc import AsyncIterator
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.sql.elements import TextClause
 from .config import settings
 
-engine: Engine = create_engine(settings.database_url, pool_pre_ping=True)
+engine: AsyncEngine = create_async_engine(
+    settings.database_url,
+    pool_size=20,
+    max_overflow=10,
+    pool_recycle=1800,
+)
+
+
+async def get_conn() -> AsyncIterator[AsyncConnection]:
+    """FastAPI dependency that yields one pooled connection per request.
+
+    Handlers that issue several queries share the same connection, paying the
+    pool checkout cost once instead of per call.
+    """
+    async with engine.connect() as conn:
+        yield conn
+
+
+# SET LOCAL does not accept bind parameters, so ef_search goes through
+# set_config(); the `true` argument scopes it to the current transaction.
+_SET_EF_SEARCH = text("SELECT set_config('hnsw.ef_search', :v, true)")
 
 
-def query(sql: str, params: dict | None = None):
+async def query(
+    sql: str | TextClause,
+    params: dict | None = None,
+    conn: AsyncConnection | None = None,
+    ef_search: int | None = None,
+):
     """Execute a read-only SQL query and return all rows.
 
     Args:
-        sql: SQL string with optional SQLAlchemy-style parameters (e.g., :name).
+        sql: SQL string or prebuilt `text()` clause with optional
+            SQLAlchemy-style parameters (e.g., :name). Callers on a hot path
+            should prepare the clause once at module load and pass it in.
         params: Optional mapping of parameter values.
+        conn: Optional connection to run on (e.g., from `get_conn`); when
+            omitted, a connection is checked out from the pool for this call.
+        ef_search: Optional hnsw.ef_search value applied for this transaction;
+            pass for ANN queries to trade recall against latency.
     Returns:
-        A list-like of row objects accessible by attribute or index.
+        A list of mapping rows indexed by column name (row["url"]); mappings
+        skip the per-access attribute resolution of SQLAlchemy Row proxies.
     """
-    with engine.connect() as conn:
-        res = conn.execute(text(sql), params or {})
-        return res.fetchall()
+    stmt = text(sql) if isinstance(sql, str) else sql
+    if conn is not None:
+        if ef_search is not None:
+            await conn.execute(_SET_EF_SEARCH, {"v": str(ef_search)})
+        res = await conn.execute(stmt, params or {})
+        return res.mappings().all()
+    async with engine.connect() as c:
+        if ef_search is not None:
+            await c.execute(_SET_EF_SEARCH, {"v": str(ef_search)})
+        res = await c.execute(stmt, params or {})
+        return res.mappings().all()
 
 
-def execute(sql: str, params: dict | None = None):
+async def execute(sql: str, params: dict | None = None):
     """Execute a write statement within a transaction.
 
     Args:
         sql: SQL string with optional SQLAlchemy-style parameters.
         params: Optional mapping of parameter values.
     """
-    with engine.begin() as conn:
-        conn.execute(text(sql), params or {})
\ No newline at end of file
+    async with engine.begin() as conn:
+        await conn.execute(text(sql), params or {})
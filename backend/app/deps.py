@@ -1,15 +1,58 @@
-"""Dependency providers for the Issue Triage API."""
-from .config import settings
-from openai import OpenAI
+"""Dependency providers and shared OpenAI helpers for the Issue Triage API."""
+import math
+from collections import OrderedDict
 
-client = None
+from fastapi import Request
+from openai import AsyncOpenAI
 
+# Bounded LRU of query embeddings keyed by (model, text). User queries repeat
+# often (re-runs, duplicate tabs, re-triage of the same issue), and a cache hit
+# replaces a 100-400ms embeddings round-trip with a dict lookup.
+_EMBED_CACHE: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+_EMBED_CACHE_MAX = 4096
 
-def get_openai_client() -> OpenAI | None:
-    """Return a lazily initialized OpenAI client or None if not configured."""
-    global client
-    if settings.openai_api_key is None:
-        return None
-    if client is None:
-        client = OpenAI(api_key=settings.openai_api_key)
-    return client
\ No newline at end of file
+
+def get_openai_client(request: Request) -> AsyncOpenAI | None:
+    """Return the OpenAI client created at app startup, or None if not configured."""
+    return request.app.state.openai_client
+
+
+def normalize(vec: list[float]) -> list[float]:
+    """Return `vec` scaled to unit length (unchanged if the norm is zero).
+
+    The docs table stores normalized vectors and queries use the inner-product
+    operator, so query vectors must be normalized too.
+    """
+    norm = math.sqrt(sum(x * x for x in vec))
+    if norm == 0.0:
+        return vec
+    return [x / norm for x in vec]
+
+
+async def embed(client: AsyncOpenAI, text: str, model: str) -> list[float]:
+    """Return the embedding for `text`, serving repeats from a bounded cache.
+
+    Args:
+        client: Configured OpenAI client.
+        text: Input text to embed.
+        model: Embedding model name (part of the cache key).
+    Returns:
+        The embedding vector.
+    Raises:
+        RuntimeError: If the API response carries no embedding.
+    """
+    key = (model, text)
+    cached = _EMBED_CACHE.get(key)
+    if cached is not None:
+        _EMBED_CACHE.move_to_end(key)
+        return cached
+
+    resp = await client.embeddings.create(model=model, input=text)
+    if not resp or not getattr(resp, "data", None) or len(resp.data) == 0 or not hasattr(resp.data[0], "embedding"):
+        raise RuntimeError("Failed to generate embedding")
+    vec = normalize(resp.data[0].embedding)
+
+    _EMBED_CACHE[key] = vec
+    if len(_EMBED_CACHE) > _EMBED_CACHE_MAX:
+        _EMBED_CACHE.popitem(last=False)
+    return vec
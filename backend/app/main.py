@@ -4,10 +4,47 @@ Exposes endpoints for semantic search, issue triage suggestions, and Q&A by
 including the search, triage, and qa routers.
 """
 
+from contextlib import asynccontextmanager
+
+import httpx
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from openai import AsyncOpenAI
+
+from .config import settings
 from .routers import search, triage, qa
 
-app = FastAPI(title="Issue Triage API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the OpenAI client once at startup and share it via app state.
+
+    Instantiating the client up front keeps the SDK's connection pool warm and
+    avoids a lazy-init branch on every request. The custom transport enables
+    HTTP/2 so concurrent embed and chat calls multiplex over one TLS
+    connection. The client stays None when no API key is configured, in which
+    case AI endpoints report an error.
+    """
+    app.state.openai_client = (
+        AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            http_client=httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+                timeout=settings.openai_timeout,
+            ),
+        )
+        if settings.openai_api_key
+        else None
+    )
+    yield
+    # Close the client (and its httpx pool) on shutdown; otherwise the
+    # transports leak and log unclosed-connection warnings.
+    if app.state.openai_client is not None:
+        await app.state.openai_client.close()
+
+
+app = FastAPI(title="Issue Triage API", lifespan=lifespan, default_response_class=ORJSONResponse)
 app.include_router(search.router)
 app.include_router(triage.router)
 app.include_router(qa.router)
\ No newline at end of file
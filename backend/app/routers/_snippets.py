@@ -0,0 +1,26 @@
+"""Shared snippet constants and helpers for the result-list routers.
+
+Search hits and triage candidates both expose a whitespace-flattened snippet
+plus a short display preview; keeping the constants and the cut logic here
+stops the two routers drifting apart.
+"""
+
+# Max body characters returned per snippet; the SQL LEFT(body, :blen)
+# truncation uses this so large issue bodies never cross the wire just to be
+# sliced in Python.
+SNIPPET_LEN = 300
+
+# Collapses snippet whitespace control chars in one C-level pass.
+SNIPPET_TRANS = str.maketrans({"\n": " ", "\r": " ", "\t": " "})
+
+# Display previews are cut server-side once per row so every client skips the
+# per-item slicing, and result tables ship a short string per row.
+PREVIEW_LEN = 160
+
+
+def preview(snippet: str) -> str:
+    """First ~PREVIEW_LEN characters of a snippet, cut at a word boundary."""
+    if len(snippet) <= PREVIEW_LEN:
+        return snippet
+    cut = snippet.rfind(" ", 0, PREVIEW_LEN + 1)
+    return snippet[:cut if cut > 0 else PREVIEW_LEN].rstrip() + "…"
@@ -1,48 +1,77 @@
 """Q&A router: retrieval-augmented answering over indexed documents."""
 
-from fastapi import APIRouter, HTTPException
+import json
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from openai import AsyncOpenAI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
 from ..schemas import QARequest, QAResponse
 from ..config import settings
-from ..db import query
-from ..deps import get_openai_client
+from ..db import get_conn, query
+from ..deps import embed, get_openai_client
 
 router = APIRouter(prefix="/qa", tags=["qa"])
 
-@router.post("/", response_model=QAResponse)
-def qa(req: QARequest):
-    """Answer a question using nearest retrieved documents as context."""
-    client = get_openai_client()
-    if client is None:
-        raise HTTPException(status_code=500, detail="OPENAI_API_KEY not configured")
+# Statements are prepared once at import; the handler just picks the right one.
+# LEFT(body, :blen) truncates server-side so large issue bodies never cross
+# the wire just to be sliced in Python.
+_SQL_QA = text(
+    "SELECT url, title, LEFT(body, :blen) AS body, (embedding <#> :vec) AS score "
+    "FROM docs ORDER BY embedding <#> :vec ASC LIMIT :k"
+)
+_SQL_QA_REPO = text(
+    "SELECT url, title, LEFT(body, :blen) AS body, (embedding <#> :vec) AS score "
+    "FROM docs WHERE repo = :repo ORDER BY embedding <#> :vec ASC LIMIT :k"
+)
 
-    embedding_response = client.embeddings.create(model=settings.embedding_model, input=req.question)
-    if not embedding_response or not getattr(embedding_response, "data", None) or len(embedding_response.data) == 0 or not hasattr(embedding_response.data[0], "embedding"):
-        raise HTTPException(status_code=500, detail="Failed to generate embedding")
-    emb = embedding_response.data[0].embedding
+# Max body characters included per context block
+_CONTEXT_BODY_LEN = 1500
 
-    base_sql = "SELECT url, title, body, (embedding <-> :vec) AS score FROM docs"
-    where_clause = " WHERE repo = :repo" if req.repo else ""
-    order_limit = " ORDER BY embedding <-> :vec ASC LIMIT :k"
-    sql = base_sql + where_clause + order_limit
+# System prompt shared by all requests; a module constant avoids re-allocating
+# the string per request (and keeps the stdlib name `sys` unshadowed).
+_SYS_QA = "You answer questions using only the provided context. Keep answers concise and include inline citations [n] that map to a citations list."
 
-    params = {"vec": emb, "k": req.k}
+async def _build_messages(req: QARequest, client: AsyncOpenAI, conn: AsyncConnection) -> tuple[list[dict], list[str]]:
+    """Retrieve context rows for the question and build the chat messages.
+
+    Returns:
+        The chat messages for the completion call and the citation URLs.
+    """
+    try:
+        emb = await embed(client, req.question, settings.embedding_model)
+    except RuntimeError:
+        raise HTTPException(status_code=500, detail="Failed to generate embedding")
+
+    stmt = _SQL_QA_REPO if req.repo else _SQL_QA
+    params = {"vec": emb, "k": req.k, "blen": _CONTEXT_BODY_LEN}
     if req.repo:
         params["repo"] = req.repo
-    rows = query(sql, params)
+    rows = await query(stmt, params, conn=conn, ef_search=settings.hnsw_ef_search)
+
+    citations = [r["url"] for r in rows]
 
-    contexts = []
-    citations = []
-    for r in rows:
-        contexts.append(f"Title: {r.title or ''}\nURL: {r.url}\nContent:\n{(r.body or '')[:1500]}")
-        citations.append(r.url)
+    context_body = "\n\n".join(
+        f"[{i+1}] Title: {r['title'] or ''}\nURL: {r['url']}\nContent:\n{r['body'] or ''}"
+        for i, r in enumerate(rows)
+    )
+    user = context_body + f"\n\nQuestion: {req.question}\nAnswer with references like [1], [2]."
+    messages = [{"role": "system", "content": _SYS_QA}, {"role": "user", "content": user}]
+    return messages, citations
 
-    sys = "You answer questions using only the provided context. Keep answers concise and include inline citations [n] that map to a citations list."
-    numbered = [f"[{i+1}] {c}" for i, c in enumerate(contexts)]
-    user = "\n\n".join(numbered) + f"\n\nQuestion: {req.question}\nAnswer with references like [1], [2]."
 
-    chat = client.chat.completions.create(
+@router.post("/", response_model=QAResponse)
+async def qa(req: QARequest, client: AsyncOpenAI | None = Depends(get_openai_client), conn: AsyncConnection = Depends(get_conn)):
+    """Answer a question using nearest retrieved documents as context."""
+    if client is None:
+        raise HTTPException(status_code=500, detail="OPENAI_API_KEY not configured")
+
+    messages, citations = await _build_messages(req, client, conn)
+
+    chat = await client.chat.completions.create(
         model=settings.generation_model,
-        messages=[{"role":"system","content":sys},{"role":"user","content":user}],
+        messages=messages,
         temperature=0.1,
     )
 
@@ -50,4 +79,35 @@ def qa(req: QARequest):
         raise HTTPException(status_code=500, detail="Failed to generate answer")
 
     answer = chat.choices[0].message.content or ""
-    return QAResponse(answer=answer, citations=citations)
\ No newline at end of file
+    return QAResponse(answer=answer, citations=citations)
+
+
+@router.post("/stream")
+async def qa_stream(req: QARequest, client: AsyncOpenAI | None = Depends(get_openai_client), conn: AsyncConnection = Depends(get_conn)):
+    """Answer a question as a server-sent event stream.
+
+    Emits one `citations` event carrying the citation URLs, then `data` events
+    with answer deltas as the model produces them, so clients can render the
+    answer at first-token latency instead of waiting for the full generation.
+    """
+    if client is None:
+        raise HTTPException(status_code=500, detail="OPENAI_API_KEY not configured")
+
+    messages, citations = await _build_messages(req, client, conn)
+
+    stream = await client.chat.completions.create(
+        model=settings.generation_model,
+        messages=messages,
+        temperature=0.1,
+        stream=True,
+    )
+
+    async def gen():
+        yield f"event: citations\ndata: {json.dumps({'citations': citations})}\n\n"
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                yield f"data: {json.dumps({'delta': delta})}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(gen(), media_type="text/event-stream")
\ No newline at end of file
@@ -1,14 +1,32 @@
 """Search router: vector search over embedded documents."""
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from openai import AsyncOpenAI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
 from ..schemas import SearchResponse, SearchResponseItem
 from ..config import settings
-from ..db import query
-from ..deps import get_openai_client
+from ..db import get_conn, query
+from ..deps import embed, get_openai_client
+from ._snippets import SNIPPET_LEN, SNIPPET_TRANS, preview
 
 router = APIRouter(prefix="/search", tags=["search"])
 
+# Statements are prepared once at import; the handler just picks the right one.
+# Vectors are normalized at ingest and query time, so negative inner product
+# (<#>) gives cosine ordering; scores are in [-1, 0], lower is more similar.
+# LEFT(body, :blen) truncates server-side so large issue bodies never cross
+# the wire just to be sliced in Python.
+_SQL_SEARCH = text(
+    "SELECT id, url, repo, title, LEFT(body, :blen) AS body, (embedding <#> :vec) AS score "
+    "FROM docs ORDER BY embedding <#> :vec ASC LIMIT :k"
+)
+_SQL_SEARCH_REPO = text(
+    "SELECT id, url, repo, title, LEFT(body, :blen) AS body, (embedding <#> :vec) AS score "
+    "FROM docs WHERE repo = :repo ORDER BY embedding <#> :vec ASC LIMIT :k"
+)
+
 @router.get("/", response_model=SearchResponse)
-def search(q: str, repo: str | None = None, k: int = 8):
+async def search(q: str, repo: str | None = None, k: int = 8, client: AsyncOpenAI | None = Depends(get_openai_client), conn: AsyncConnection = Depends(get_conn)):
     """Search embedded docs by query embedding and vector distance.
 
     Args:
@@ -17,27 +35,19 @@ def search(q: str, repo: str | None = None, k: int = 8):
         k: Max number of results to return.
     """
     # Embed the query
-    client = get_openai_client()
     if client is None:
         raise HTTPException(status_code=500, detail="OPENAI_API_KEY not configured")
-    emb = client.embeddings.create(model=settings.embedding_model, input=q).data[0].embedding
+    emb = await embed(client, q, settings.embedding_model)
 
-    # Use cosine distance operator <#> for normalized vectors, or L2 <-> if not normalized
-    # Here we use L2; for cosine, store normalized vectors at index time.
-    sql = (
-        "SELECT id, url, repo, title, body, (embedding <-> :vec) AS score "
-        "FROM docs "
-        + ("WHERE repo = :repo " if repo else "") +
-        "ORDER BY embedding <-> :vec ASC LIMIT :k"
-    )
-    params = {"vec": emb, "k": k}
+    stmt = _SQL_SEARCH_REPO if repo else _SQL_SEARCH
+    params = {"vec": emb, "k": k, "blen": SNIPPET_LEN}
     if repo:
         params["repo"] = repo
-    rows = query(sql, params)
+    rows = await query(stmt, params, conn=conn, ef_search=settings.hnsw_ef_search)
 
     items = []
     for r in rows:
-        body = r.body or ""
-        snippet = body[:300].replace("\n", " ")
-        items.append(SearchResponseItem(id=r.id, url=r.url, repo=r.repo, title=r.title, snippet=snippet, score=float(r.score)))
+        body = r["body"] or ""
+        snippet = body.translate(SNIPPET_TRANS)
+        items.append(SearchResponseItem(id=r["id"], url=r["url"], repo=r["repo"], title=r["title"], snippet=snippet, snippet_preview=preview(snippet), score=float(r["score"])))
     return SearchResponse(items=items)
\ No newline at end of file
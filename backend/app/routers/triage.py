@@ -1,52 +1,132 @@
 """Triage router: duplicate suggestion and draft reply generation."""
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+import dataclasses
+import json
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from openai import AsyncOpenAI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
 from ..schemas import TriageRequest, TriageResponse, TriageCandidate
 from ..config import settings
-from ..db import query
-from ..deps import get_openai_client
+from ..db import get_conn, query
+from ..deps import embed, get_openai_client
+from ._snippets import SNIPPET_LEN, SNIPPET_TRANS, preview
 
 router = APIRouter(prefix="/triage", tags=["triage"])
 
-@router.post("/", response_model=TriageResponse)
-def triage(req: TriageRequest):
-    """Suggest duplicates and draft a reply using retrieved candidates."""
-    client = get_openai_client()
-    if client is None:
-        raise HTTPException(status_code=500, detail="OPENAI_API_KEY not configured")
+# Statements are prepared once at import; the handler just picks the right one.
+# LEFT(body, :blen) truncates server-side so large issue bodies never cross
+# the wire just to be sliced in Python.
+_SQL_TRIAGE = text(
+    "SELECT id, url, title, LEFT(body, :blen) AS body, (embedding <#> :vec) AS score "
+    "FROM docs ORDER BY embedding <#> :vec ASC LIMIT :k"
+)
+_SQL_TRIAGE_REPO = text(
+    "SELECT id, url, title, LEFT(body, :blen) AS body, (embedding <#> :vec) AS score "
+    "FROM docs WHERE repo = :repo ORDER BY embedding <#> :vec ASC LIMIT :k"
+)
+
+# Max body characters per LLM context block; candidate snippets take the
+# first SNIPPET_LEN characters of that.
+_CONTEXT_BODY_LEN = 800
+
+# O(1) ping run while the embedding round-trip is in flight; it forces the
+# request connection's checkout and handshake to overlap the wait instead of
+# adding to it. (A recent-issues shortlist was tried here, but with no index
+# on created_at it was a discarded seq scan per request.)
+_SQL_PING = text("SELECT 1")
+
+# System prompt shared by all requests; a module constant avoids re-allocating
+# the string per request (and keeps the stdlib name `sys` unshadowed).
+_SYS_TRIAGE = "You draft concise, helpful GitHub issue replies. Always include inline citations with URLs provided."
 
+async def _build_candidates(req: TriageRequest, client: AsyncOpenAI, conn: AsyncConnection) -> tuple[list[TriageCandidate], list[dict]]:
+    """Retrieve duplicate candidates and build the chat messages for the draft.
+
+    Returns:
+        The candidate list and the chat messages for the completion call.
+    """
     q_text = f"{req.title}\n\n{req.body}".strip()
-    emb = client.embeddings.create(model=settings.embedding_model, input=q_text).data[0].embedding
 
-    sql = (
-        "SELECT id, url, title, body, (embedding <-> :vec) AS score FROM docs "
-        + ("WHERE repo = :repo " if req.repo else "") +
-        "ORDER BY embedding <-> :vec ASC LIMIT :k"
+    # The embedding call is a ~100-400ms network round-trip; ping the DB
+    # connection concurrently so its warm-up cost overlaps that wait.
+    emb, _ = await asyncio.gather(
+        embed(client, q_text, settings.embedding_model),
+        query(_SQL_PING, conn=conn),
     )
-    params = {"vec": emb, "k": req.k}
+
+    stmt = _SQL_TRIAGE_REPO if req.repo else _SQL_TRIAGE
+    params = {"vec": emb, "k": req.k, "blen": _CONTEXT_BODY_LEN}
     if req.repo:
         params["repo"] = req.repo
-    rows = query(sql, params)
+    rows = await query(stmt, params, conn=conn, ef_search=settings.hnsw_ef_search)
 
     cands = []
     context_blocks = []
     for r in rows:
-        snippet = (r.body or "")[:300].replace("\n", " ")
-        cands.append(TriageCandidate(id=r.id, url=r.url, title=r.title, snippet=snippet, score=float(r.score)))
-        context_blocks.append(f"- {r.title or ''} ({r.url})\n{(r.body or '')[:800]}")
+        snippet = (r["body"] or "")[:SNIPPET_LEN].translate(SNIPPET_TRANS)
+        cands.append(TriageCandidate(id=r["id"], url=r["url"], title=r["title"], snippet=snippet, snippet_preview=preview(snippet), score=float(r["score"])))
+        context_blocks.append(f"- {r['title'] or ''} ({r['url']})\n{r['body'] or ''}")
 
     # Draft reply with citations
-    sys = "You draft concise, helpful GitHub issue replies. Always include inline citations with URLs provided."
     user = (
         "A new issue was created with the following content. "
         "Suggest a brief reply that points to possible duplicates, with links, and asks for any missing repro details.\n\n"
         f"NEW ISSUE:\nTitle: {req.title}\nBody: {req.body}\n\n"
         f"POSSIBLE DUPLICATES:\n{chr(10).join(context_blocks)}"
     )
-    chat = client.chat.completions.create(
+    messages = [{"role": "system", "content": _SYS_TRIAGE}, {"role": "user", "content": user}]
+    return cands, messages
+
+
+@router.post("/", response_model=TriageResponse)
+async def triage(req: TriageRequest, client: AsyncOpenAI | None = Depends(get_openai_client), conn: AsyncConnection = Depends(get_conn)):
+    """Suggest duplicates and draft a reply using retrieved candidates."""
+    if client is None:
+        raise HTTPException(status_code=500, detail="OPENAI_API_KEY not configured")
+
+    cands, messages = await _build_candidates(req, client, conn)
+
+    chat = await client.chat.completions.create(
         model=settings.generation_model,
-        messages=[{"role":"system","content":sys},{"role":"user","content":user}],
+        messages=messages,
         temperature=0.2,
     )
     draft = chat.choices[0].message.content
-    return TriageResponse(candidates=cands, draft_reply=draft)
\ No newline at end of file
+    return TriageResponse(candidates=cands, draft_reply=draft)
+
+
+@router.post("/stream")
+async def triage_stream(req: TriageRequest, client: AsyncOpenAI | None = Depends(get_openai_client), conn: AsyncConnection = Depends(get_conn)):
+    """Suggest duplicates as a server-sent event stream.
+
+    Emits one `candidates` event with the full candidate list, then `data`
+    events carrying draft-reply deltas as the model produces them, so clients
+    can show candidates and the growing draft without waiting for the full
+    generation.
+    """
+    if client is None:
+        raise HTTPException(status_code=500, detail="OPENAI_API_KEY not configured")
+
+    cands, messages = await _build_candidates(req, client, conn)
+
+    stream = await client.chat.completions.create(
+        model=settings.generation_model,
+        messages=messages,
+        temperature=0.2,
+        stream=True,
+    )
+
+    async def gen():
+        payload = {"candidates": [dataclasses.asdict(c) for c in cands]}
+        yield f"event: candidates\ndata: {json.dumps(payload)}\n\n"
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                yield f"data: {json.dumps({'delta': delta})}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(gen(), media_type="text/event-stream")
\ No newline at end of file
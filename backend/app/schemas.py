@@ -1,14 +1,22 @@
-"""Pydantic request/response schemas for API endpoints."""
+"""Pydantic request/response schemas for API endpoints.
+
+The per-item response models are slotted pydantic dataclasses: result lists
+instantiate one of these per row on every request, and slots avoid the
+per-instance __dict__ allocation of a regular model.
+"""
 
 from pydantic import BaseModel
+from pydantic.dataclasses import dataclass
 
-class SearchResponseItem(BaseModel):
+@dataclass(slots=True)
+class SearchResponseItem:
     """One search hit returned to the client."""
     id: int
     url: str
     repo: str
     title: str | None
     snippet: str
+    snippet_preview: str
     score: float
 
 class SearchResponse(BaseModel):
@@ -22,12 +30,14 @@ class TriageRequest(BaseModel):
     repo: str | None = None
     k: int = 8
 
-class TriageCandidate(BaseModel):
+@dataclass(slots=True)
+class TriageCandidate:
     """One candidate duplicate returned to the client."""
     id: int
     url: str
     title: str | None
     snippet: str
+    snippet_preview: str
     score: float
 
 class TriageResponse(BaseModel):
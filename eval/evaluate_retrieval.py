@@ -3,26 +3,44 @@ Simple retrieval eval scaffold.
 Provide a CSV in eval/goldsets with columns: query, expected_url (or pipe-separated list).
 Computes Recall@k and MRR@k.
 """
+import asyncio
 import csv, argparse
+from openai import AsyncOpenAI
+from sqlalchemy import text
 from backend.app.config import settings
-from backend.app.db import query
-from backend.app.deps import get_openai_client
+from backend.app.db import engine, query
+from backend.app.deps import normalize
 
+_client: AsyncOpenAI | None = None
 
-def retrieve(q: str, k: int = 5, repo: str | None = None):
-    client = get_openai_client()
-    if client is None:
+_SQL_RETRIEVE = text(
+    "SELECT url, (embedding <#> :vec) AS score "
+    "FROM docs ORDER BY embedding <#> :vec ASC LIMIT :k"
+)
+_SQL_RETRIEVE_REPO = text(
+    "SELECT url, (embedding <#> :vec) AS score "
+    "FROM docs WHERE repo = :repo ORDER BY embedding <#> :vec ASC LIMIT :k"
+)
+
+
+def _get_client() -> AsyncOpenAI:
+    """Return a shared OpenAI client for the eval run."""
+    global _client
+    if settings.openai_api_key is None:
         raise SystemExit("OpenAI client is not configured (missing API key). Aborting.")
-    emb = client.embeddings.create(model=settings.embedding_model, input=q).data[0].embedding
-    sql = (
-        "SELECT url, (embedding <-> :vec) AS score FROM docs "
-        + ("WHERE repo = :repo " if repo else "") +
-        "ORDER BY embedding <-> :vec ASC LIMIT :k"
-    )
+    if _client is None:
+        _client = AsyncOpenAI(api_key=settings.openai_api_key)
+    return _client
+
+
+async def retrieve(q: str, k: int = 5, repo: str | None = None):
+    client = _get_client()
+    emb = normalize((await client.embeddings.create(model=settings.embedding_model, input=q)).data[0].embedding)
+    stmt = _SQL_RETRIEVE_REPO if repo else _SQL_RETRIEVE
     params = {"vec": emb, "k": k}
     if repo:
         params["repo"] = repo
-    return query(sql, params)
+    return await query(stmt, params)
 
 
 def recall_mrr(golds: list[str], hits: list[str]):
@@ -37,7 +55,7 @@ def recall_mrr(golds: list[str], hits: list[str]):
     return recall, mrr
 
 
-if __name__ == "__main__":
+async def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--file", required=True)
     ap.add_argument("--k", type=int, default=5)
@@ -50,9 +68,13 @@ if __name__ == "__main__":
         for row in reader:
             q = row["query"]
             golds = [u.strip() for u in row["expected_url"].split("|")]
-            rows = retrieve(q, k=args.k, repo=args.repo)
-            hits = [r.url for r in rows]
+            rows = await retrieve(q, k=args.k, repo=args.repo)
+            hits = [r["url"] for r in rows]
             r, m = recall_mrr(golds, hits)
             R.append(r); M.append(m)
-    import statistics as st
-    print({"Recall@k": sum(R)/len(R), "MRR@k": sum(M)/len(M)})
\ No newline at end of file
+    await engine.dispose()
+    print({"Recall@k": sum(R)/len(R), "MRR@k": sum(M)/len(M)})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
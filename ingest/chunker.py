@@ -9,14 +9,20 @@ Changes in this version:
 """
 
 from __future__ import annotations
+import os
 import re
+from bisect import bisect_right
+from itertools import accumulate
 from dataclasses import dataclass
 from functools import lru_cache
 from collections.abc import Callable
-import tiktoken
+from typing import TYPE_CHECKING
 from clean_text import md_to_text
 from config import EMBEDDING_MODEL
 
+if TYPE_CHECKING:
+    import tiktoken
+
 @dataclass(slots=True)
 class Chunk:
     """A contiguous span of sentences prepared for embedding.
@@ -39,32 +45,92 @@ class Chunk:
 # ---------- Token counting ----------
 
 @lru_cache(maxsize=None)
-def get_token_counter(model: str = "text-embedding-3-small") -> Callable[[str], int]:
-    """Return a function that counts tokens using tiktoken for the given model.
-
-    Falls back to a default encoding if the model is unknown.
+def _encoding_for(model: str) -> tiktoken.Encoding:
+    """Return the tiktoken encoding for `model`, constructed once per process.
+
+    Falls back to a default encoding if the model is unknown. Encoder
+    construction loads the BPE vocabulary and is by far the most expensive
+    tokenizer operation, so the single and batch counters share this instance.
+    tiktoken itself is imported here, on first use, so importing this module
+    (e.g. just for md_to_text or the dataclasses) stays cheap.
     """
+    import tiktoken
+
     try:
-        enc = tiktoken.encoding_for_model(model)
+        return tiktoken.encoding_for_model(model)
     except Exception:
-        enc = tiktoken.get_encoding("cl100k_base")
+        return tiktoken.get_encoding("cl100k_base")
 
-    def count_tokens_tiktoken(text: str) -> int:
-        """Count tokens in `text` using the model-specific tiktoken encoder."""
+
+@lru_cache(maxsize=None)
+def get_token_counter(model: str = "text-embedding-3-small") -> Callable[[str], int]:
+    """Return a function that counts tokens using tiktoken for the given model."""
+    enc = _encoding_for(model)
+
+    @lru_cache(maxsize=65536)
+    def _count_cached(text: str) -> int:
         return len(enc.encode(text))
 
+    def count_tokens_tiktoken(text: str) -> int:
+        """Count tokens in `text` using the model-specific tiktoken encoder.
+
+        Counts for short texts are memoized: boilerplate sentences recur a lot
+        during ingest and a cache hit replaces the encode with a dict lookup.
+        Long texts rarely repeat, so they bypass the cache to keep its memory
+        bounded.
+        """
+        if len(text) > 2048:
+            return len(enc.encode(text))
+        return _count_cached(text)
+
     return count_tokens_tiktoken
 
-count_tokens: Callable[[str], int] = get_token_counter(EMBEDDING_MODEL)
+
+@lru_cache(maxsize=None)
+def get_batch_token_counter(model: str = "text-embedding-3-small") -> Callable[[list[str]], list[int]]:
+    """Return a function that counts tokens for a batch of texts at once."""
+    enc = _encoding_for(model)
+
+    num_threads = os.cpu_count() or 1
+
+    def count_tokens_batch(texts: list[str]) -> list[int]:
+        """Count tokens for each text using one batched, multi-threaded encode.
+
+        A single encode_ordinary_batch call amortizes the per-call FFI
+        overhead and lets tiktoken parallelize across its Rust thread pool.
+        """
+        return [len(ids) for ids in enc.encode_ordinary_batch(texts, num_threads=num_threads)]
+
+    return count_tokens_batch
+
+def count_tokens(text: str) -> int:
+    """Count tokens for one text with the configured model's counter.
+
+    Thin indirection (the lru_cache lookup is a dict hit) so the encoder is
+    only constructed when token counting is actually needed.
+    """
+    return get_token_counter(EMBEDDING_MODEL)(text)
+
+
+def count_tokens_batch(texts: list[str]) -> list[int]:
+    """Count tokens for a batch of texts with the configured model's counter."""
+    return get_batch_token_counter(EMBEDDING_MODEL)(texts)
 
 # ---------- Sentence splitting ----------
 
-_SENT_END_RE = re.compile(r"""
-    (?<= [.!?] )
-    (?: ["')\]] )?
-    \s+
-    (?=(?:[A-Z0-9"(\[]) )
-""", re.X)
+# Compiled once at import: the chunker runs these on every paragraph of every
+# document, so skip the `re` cache lookup per call. _CRLF_RE also replaces the
+# `.replace("\r\n", "\n")` pre-pass with a single sub (no intermediate string).
+_CRLF_RE = re.compile(r"\r\n?")
+_PARA_RE = re.compile(r"\n\s*\n")
+_INTRA_NL_RE = re.compile(r"\s*\n\s*")
+
+# Character classes for the sentence-boundary scanner: a boundary is a
+# terminator, optionally one closing quote/bracket, whitespace, then a
+# character that plausibly starts a new sentence.
+_SENT_PUNCT = frozenset(".!?")
+_SENT_CLOSE = frozenset("\"')]")
+_SENT_START = frozenset("\"([")
 
 
 def split_into_paragraphs(text: str) -> list[str]:
@@ -77,39 +143,48 @@ def split_into_paragraphs(text: str) -> list[str]:
     Returns:
         List of non-empty, stripped paragraphs.
     """
-    return [p.strip() for p in re.split(r"\n\s*\n", text.replace("\r\n", "\n")) if p.strip()]
+    return [p.strip() for p in _PARA_RE.split(_CRLF_RE.sub("\n", text)) if p.strip()]
 
 
 def split_paragraph_into_sentences(paragraph: str) -> list[str]:
-    """Split a paragraph into sentences using a simple regex heuristic.
+    """Split a paragraph into sentences using a simple single-pass heuristic.
 
-    Collapses intra-paragraph newlines and avoids false splits around
-    trailing quotes/brackets after sentence punctuation.
+    Collapses intra-paragraph newlines, then scans the text once: a sentence
+    boundary is punctuation (.!?), optionally one trailing quote/bracket,
+    whitespace, and a following character that can start a sentence. The
+    linear scan replaces the earlier regex split plus per-buffer re-matching,
+    which was quadratic on long paragraphs, and keeps trailing quotes with
+    their sentence.
 
     Args:
         paragraph: A single paragraph of text.
     Returns:
         Ordered list of sentence strings.
     """
-    tmp = re.sub(r"\s*\n\s*", " ", paragraph.strip())
-    parts = _SENT_END_RE.split(tmp)
+    tmp = _INTRA_NL_RE.sub(" ", paragraph.strip())
     out: list[str] = []
-    buf = ""
-    for part in parts:
-        piece = part.strip()
-        if not piece:
-            continue
-        if not buf:
-            buf = piece
-        else:
-            # If the current buffer does not appear to end a sentence, keep appending
-            if not re.search(r'[.!?]["\')\]]?$', buf):
-                buf = (buf + " " + piece).strip()
-            else:
-                out.append(buf)
-                buf = piece
-    if buf:
-        out.append(buf)
+    n = len(tmp)
+    start = 0
+    i = 0
+    while i < n:
+        if tmp[i] in _SENT_PUNCT:
+            j = i + 1
+            if j < n and tmp[j] in _SENT_CLOSE:
+                j += 1
+            k = j
+            while k < n and tmp[k].isspace():
+                k += 1
+            if k > j and k < n and (tmp[k].isupper() or tmp[k].isdigit() or tmp[k] in _SENT_START):
+                piece = tmp[start:j].strip()
+                if piece:
+                    out.append(piece)
+                start = k
+                i = k
+                continue
+        i += 1
+    piece = tmp[start:].strip()
+    if piece:
+        out.append(piece)
     return out
 
 
@@ -121,7 +196,7 @@ def sentence_token_counts(sentences: list[str]) -> list[int]:
     Returns:
         List of token counts aligned with `sentences`.
     """
-    return [count_tokens(s) for s in sentences]
+    return count_tokens_batch(sentences)
 
 # ---------- Chunking ----------
 
@@ -130,6 +205,7 @@ def pack_sentences_into_chunks(
     sentences: list[str],
     max_tokens: int = 600,
     overlap_tokens: int = 100,
+    toks: list[int] | None = None,
 ) -> list[Chunk]:
     """Greedily pack sentences into chunks under a token target with optional overlap.
 
@@ -140,6 +216,8 @@ def pack_sentences_into_chunks(
         sentences: Sentences to pack.
         max_tokens: Target maximum tokens per chunk (soft cap).
         overlap_tokens: Approximate backward token overlap between chunks.
+        toks: Optional precomputed token counts aligned with `sentences`;
+            computed here when omitted.
     Returns:
         A list of `Chunk` instances covering `sentences`.
     Raises:
@@ -150,49 +228,66 @@ def pack_sentences_into_chunks(
     if overlap_tokens < 0:
         raise ValueError("overlap_tokens must be >= 0")
 
-    toks = sentence_token_counts(sentences)
+    if toks is None:
+        toks = sentence_token_counts(sentences)
     chunks: list[Chunk] = []
 
+    n = len(sentences)
+    # prefix[k] holds the tokens in sentences[:k]; chunk boundaries and
+    # overlap restarts then become binary searches over a monotone array
+    # instead of per-sentence accumulation loops.
+    prefix = list(accumulate(toks, initial=0))
+
     i = 0
     cid = 0
-    n = len(sentences)
     while i < n:
-        cur_tokens = 0
-        start_i = i
-        end_i = i - 1
-        while i < n:
-            sentence_toks = toks[i]
-            if cur_tokens + sentence_toks <= max_tokens or end_i < start_i:
-                cur_tokens += sentence_toks
-                end_i = i
-                i += 1
-            else:
-                break
-
-        text = " ".join(sentences[start_i:end_i + 1]).strip()
+        # Largest end with sum(toks[i:end+1]) <= max_tokens; always admit at
+        # least one sentence so oversize sentences still form a chunk.
+        end_i = max(bisect_right(prefix, prefix[i] + max_tokens) - 2, i)
+        # The prefix-sum difference is the same per-sentence total the old
+        # accumulation loop produced; reusing it skips a full re-encode of
+        # the joined text. The sum can differ from an exact recount by at
+        # most one token per join, and the hard cap is enforced downstream
+        # with generous headroom.
+        cur_tokens = prefix[end_i + 1] - prefix[i]
+        text = " ".join(sentences[i:end_i + 1]).strip()
         chunks.append(Chunk(
             chunk_id=cid,
             text=text,
-            start_sentence=start_i,
+            start_sentence=i,
             end_sentence=end_i,
-            token_count=count_tokens(text),
+            token_count=cur_tokens,
         ))
         cid += 1
 
-        if i >= n or overlap_tokens == 0:
+        if end_i + 1 >= n or overlap_tokens == 0:
+            i = end_i + 1
             continue
 
-        overlap_needed = overlap_tokens
-        j = end_i
-        cum = 0
-        while j >= start_i and cum < overlap_needed:
-            cum += toks[j]
-            j -= 1
-        i = max(j + 1, start_i)
+        # Largest restart m with sum(toks[m:end_i+1]) >= overlap_tokens,
+        # clamped to start at least one sentence past the current chunk's
+        # start. (The old accumulation loop clamped to the start itself,
+        # which looped forever on a single-sentence chunk whose token count
+        # reached the overlap target.)
+        i = max(bisect_right(prefix, prefix[end_i + 1] - overlap_tokens) - 1, i + 1)
 
     return chunks
 
 
+def split_text_into_sentences(text: str) -> list[str]:
+    """Split raw text into an ordered, document-wide list of sentences.
+
+    Args:
+        text: Raw input text (possibly Markdown; not cleaned here).
+    Returns:
+        Sentences across all paragraphs, in document order.
+    """
+    sentences: list[str] = []
+    for p in split_into_paragraphs(text):
+        sentences.extend(split_paragraph_into_sentences(p))
+    return sentences
+
+
 def chunk_text(
     text: str,
     max_tokens: int = 600,
@@ -207,23 +302,33 @@ def chunk_text(
     Returns:
         Chunks covering the text according to `max_tokens` and `overlap_tokens`.
     """
-    paragraphs = split_into_paragraphs(text)
-    sentences: list[str] = []
-    for p in paragraphs:
-        sentences.extend(split_paragraph_into_sentences(p))
+    sentences = split_text_into_sentences(text)
     return pack_sentences_into_chunks(sentences, max_tokens=max_tokens, overlap_tokens=overlap_tokens)
 
 # ---------- Safety: enforce hard cap ----------
 
 
-def enforce_hard_cap(chunks: list[Chunk], cap: int) -> list[Chunk]:
+def enforce_hard_cap(
+    chunks: list[Chunk],
+    cap: int,
+    sentences: list[str] | None = None,
+    toks: list[int] | None = None,
+) -> list[Chunk]:
     """
     Ensure each chunk.token_count <= cap.
     If a chunk exceeds cap, split it by sentences with zero overlap until all subchunks fit.
     The sentence indices in subchunks refer to the original positions.
+
+    When the document-wide `sentences`/`toks` arrays are passed (as produced by
+    `split_text_into_sentences` / `sentence_token_counts`), oversize chunks are
+    re-packed via index slices into those arrays, skipping the second sentence
+    split and tokenizer pass; sub-chunk token counts are then the sum of the
+    per-sentence counts, which is within the cap headroom of an exact recount.
+    Without the arrays, each oversize chunk's text is re-split and re-encoded.
     """
     safe: list[Chunk] = []
     next_id = 0
+    reuse = sentences is not None and toks is not None
     for c in chunks:
         if c.token_count <= cap:
             safe.append(Chunk(
@@ -238,20 +343,23 @@ def enforce_hard_cap(chunks: list[Chunk], cap: int) -> list[Chunk]:
             continue
 
         # Split the overlong chunk
-        # Reconstruct its sentence list using the original text segmentation heuristic
-        # We can't rely on exact original sentence indices here unless we resplit the full document;
-        # so we split c.text into sentences and create subchunks that fit <= cap.
-        local_sentences = split_paragraph_into_sentences(c.text)
-        toks = sentence_token_counts(local_sentences)
+        start_i_global = c.start_sentence
+        if reuse:
+            # Chunk indices refer into the shared arrays, so slice instead of
+            # re-splitting and re-encoding the chunk body.
+            local_sentences = sentences[c.start_sentence:c.end_sentence + 1]
+            local_toks = toks[c.start_sentence:c.end_sentence + 1]
+        else:
+            local_sentences = split_paragraph_into_sentences(c.text)
+            local_toks = sentence_token_counts(local_sentences)
 
         i = 0
-        start_i_global = c.start_sentence
         while i < len(local_sentences):
             cur_tokens = 0
             start_i_local = i
             end_i_local = i - 1
             while i < len(local_sentences):
-                sentence_toks = toks[i]
+                sentence_toks = local_toks[i]
                 if cur_tokens + sentence_toks <= cap or end_i_local < start_i_local:
                     cur_tokens += sentence_toks
                     end_i_local = i
@@ -264,7 +372,7 @@ def enforce_hard_cap(chunks: list[Chunk], cap: int) -> list[Chunk]:
                 text=sub_text,
                 start_sentence=start_i_global + start_i_local,
                 end_sentence=start_i_global + end_i_local,
-                token_count=count_tokens(sub_text),
+                token_count=cur_tokens if reuse else count_tokens(sub_text),
                 title=c.title
             ))
             next_id += 1
@@ -306,21 +414,26 @@ def create_chunks_for_document(title: str, body: str, chunk_size: int, overlap_t
     # Clean the text
     text = md_to_text(body)
 
-    # Create full document context prefix
-    chunks = chunk_text(text, max_tokens=chunk_size, overlap_tokens=overlap_tokens)
+    # Split and tokenize once; packing and cap enforcement below share these arrays.
+    sentences = split_text_into_sentences(text)
+    toks = sentence_token_counts(sentences)
+    chunks = pack_sentences_into_chunks(sentences, max_tokens=chunk_size, overlap_tokens=overlap_tokens, toks=toks)
 
     # Enforce hard cap (auto-split any oversized chunk). Assumes the context prefix
     # will never exceed ~200 tokens.
-    chunks = enforce_hard_cap(chunks, cap=max_embed_tokens-200)
+    chunks = enforce_hard_cap(chunks, cap=max_embed_tokens-200, sentences=sentences, toks=toks)
 
     context_prefix = f"Title: {title}\n\n" if title else ""
 
     total = len(chunks)
     if total > 1:
+        # The prefix is identical for every part; count it once and add,
+        # rather than re-encoding each full prefixed chunk body.
+        prefix_tokens = count_tokens(context_prefix) if context_prefix else 0
         for i, chunk in enumerate(chunks, start=1):
             part = f"part {i}/{total}"
             chunk.title = f"{title} ({part})" if title else part.capitalize()
             chunk.text = f"{context_prefix}{chunk.text}"
-            chunk.token_count = count_tokens(chunk.text)
+            chunk.token_count += prefix_tokens
 
     return chunks
\ No newline at end of file
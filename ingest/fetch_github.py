@@ -1,8 +1,12 @@
 """Fetch GitHub issues (excluding PRs) and their comments into JSONL.
 
 Prints progress updates while paging through issues and collecting comments.
+Comment fetches for a page of issues run concurrently: the workload is pure
+network I/O, so overlapping the round-trips cuts wall time roughly by the
+concurrency factor.
 """
 import argparse
+import asyncio
 import json
 import os
 import time
@@ -10,10 +14,51 @@ from typing import Any
 
 import httpx
 
+# orjson serializes straight to bytes and is several times faster than the
+# stdlib; fall back to json so the script stays runnable without it.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 BASE = "https://api.github.com"
 
 
-def fetch_issues(repo: str, max_items: int = 200, token: str | None = None) -> list[dict[str, Any]]:
+def _dumps(obj: Any) -> bytes:
+    """Serialize one JSONL record to bytes with the fastest available encoder."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+# Max in-flight comment requests; stays well under GitHub's secondary rate
+# limits while still overlapping most of the latency.
+_MAX_CONCURRENCY = 10
+
+# Back off only when the remaining quota actually runs low, instead of the
+# old blanket sleep between pages.
+_RATE_LIMIT_FLOOR = 10
+
+
+async def _get_comments(client: httpx.AsyncClient, sem: asyncio.Semaphore, repo: str, num: int) -> list[dict[str, Any]]:
+    """Fetch all first-page comments for one issue, bounded by `sem`."""
+    async with sem:
+        cr = await client.get(f"/repos/{repo}/issues/{num}/comments", params={"per_page": 100})
+        cr.raise_for_status()
+        return cr.json()
+
+
+async def _maybe_backoff(resp: httpx.Response) -> None:
+    """Sleep until the rate-limit window resets if the remaining quota is low."""
+    remaining = resp.headers.get("X-RateLimit-Remaining")
+    if remaining is None or int(remaining) >= _RATE_LIMIT_FLOOR:
+        return
+    reset = int(resp.headers.get("X-RateLimit-Reset", "0"))
+    delay = max(reset - time.time(), 1.0)
+    print(f"  Rate limit nearly exhausted; sleeping {delay:.0f}s…", flush=True)
+    await asyncio.sleep(delay)
+
+
+async def fetch_issues_async(repo: str, max_items: int = 200, token: str | None = None) -> list[dict[str, Any]]:
     """Fetch up to `max_items` issues (no PRs) and their comments for a repo.
 
     Args:
@@ -33,43 +78,52 @@ def fetch_issues(repo: str, max_items: int = 200, token: str | None = None) -> l
     items: list[dict[str, Any]] = []
     page = 1
     per_page = 100
+    sem = asyncio.Semaphore(_MAX_CONCURRENCY)
 
     print(f"Fetching up to {max_items} issues from {repo}...")
 
-    with httpx.Client(timeout=30.0, headers=headers, base_url=BASE) as client:
+    async with httpx.AsyncClient(
+        timeout=30.0,
+        headers=headers,
+        base_url=BASE,
+        http2=True,
+        limits=httpx.Limits(max_connections=20),
+    ) as client:
         while len(items) < max_items:
             params = {"state": "all", "per_page": per_page, "page": page}
 
             print(f"• Page {page}: requesting issues…", flush=True)
-            r = client.get(f"/repos/{repo}/issues", params=params)
+            r = await client.get(f"/repos/{repo}/issues", params=params)
             r.raise_for_status()
             all_items = r.json()
             batch = [it for it in all_items if "pull_request" not in it]
             if not batch:
                 print("No more issues found; stopping.")
                 break
+            batch = batch[:max_items - len(items)]
 
             print(f"  ↳ Received {len(batch)} issues (excluding PRs). Collecting comments…")
-            for it in batch:
-                num = it["number"]
-                cr = client.get(f"/repos/{repo}/issues/{num}/comments", params={"per_page": 100})
-                cr.raise_for_status()
-                comments = cr.json()
+            comment_lists = await asyncio.gather(
+                *[_get_comments(client, sem, repo, it["number"]) for it in batch]
+            )
+            for it, comments in zip(batch, comment_lists):
                 items.append({"issue": it, "comments": comments})
 
                 if len(items) % 25 == 0 or len(items) >= max_items:
                     print(f"  Collected {len(items)}/{max_items} issues so far…", flush=True)
 
-                if len(items) >= max_items:
-                    break
-
             page += 1
-            time.sleep(0.2)
+            await _maybe_backoff(r)
 
     print(f"Done. Total issues collected: {len(items)}")
     return items
 
 
+def fetch_issues(repo: str, max_items: int = 200, token: str | None = None) -> list[dict[str, Any]]:
+    """Synchronous wrapper around `fetch_issues_async` for CLI use."""
+    return asyncio.run(fetch_issues_async(repo, max_items=max_items, token=token))
+
+
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--repo", required=True, help="owner/name")
@@ -82,7 +136,7 @@ if __name__ == "__main__":
     os.makedirs(".data", exist_ok=True)
     out = f".data/{args.repo.replace('/', '_')}_issues.jsonl"
     print(f"Writing {len(data)} records to {out}…")
-    with open(out, "w", encoding="utf-8") as f:
+    with open(out, "wb") as f:
         for item in data:
-            f.write(json.dumps(item) + "\n")
-    print(f"Wrote {len(data)} issues to {out}")
\ No newline at end of file
+            f.write(_dumps(item) + b"\n")
+    print(f"Wrote {len(data)} issues to {out}")
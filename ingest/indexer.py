@@ -5,25 +5,95 @@ embeds the chunks with the configured embeddings model, and inserts rows
 into the Postgres docs table (with pgvector embeddings).
 """
 from __future__ import annotations
-import argparse, json
-from dataclasses import dataclass
-from typing import Any
+import argparse, asyncio, hashlib, json, math, mmap, operator, os, sqlite3
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import chain
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
 from collections.abc import Sequence
-from chunker import create_chunks_for_document
+from chunker import Chunk, create_chunks_for_document
 from config import DATABASE_URL, OPENAI_API_KEY, EMBEDDING_MODEL, EMBEDDING_TOKEN_LIMIT
-from openai import OpenAI
-import psycopg
+
+# openai, psycopg and pgvector together pull in pydantic, httpx and the C
+# adapters — hundreds of ms of import time that --help or a dry parse never
+# needs. They are imported where first used instead of at module load.
+if TYPE_CHECKING:
+    from pgvector import HalfVector
+
+# orjson parses JSONL lines several times faster than the stdlib and accepts
+# bytes directly; fall back to json so the script stays runnable without it.
+try:
+    from orjson import dumps as _dumps, loads as _loads
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
 
 # Per-request aggregate token budget for embeddings (sum across inputs)
 PER_REQUEST_TOKEN_BUDGET = 300_000
 
-client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+# Max concurrent embeddings requests per embed_rows call; keeps well under
+# typical org rate limits while overlapping the network latency.
+EMBED_CONCURRENCY = 8
 
-CREATE_SQL = """
-INSERT INTO docs (source_id, kind, repo, url, title, body, labels, created_at, updated_at, embedding)
-VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-ON CONFLICT (source_id) DO NOTHING;
-"""
+# Persistent (model, body-hash) -> vector cache; survives reruns so repeated
+# indexing of the same repo (or shared template text across repos) skips the
+# API entirely. Vectors are stored as packed float32, matching the halfvec
+# precision they end up in anyway.
+EMBED_CACHE_PATH = os.path.join(".data", "embeddings.db")
+
+
+def _body_key(body: str) -> bytes:
+    """16-byte blake2b digest of a chunk body, used as the dedup/cache key."""
+    return hashlib.blake2b(body.encode("utf-8"), digest_size=16).digest()
+
+
+def _open_embed_cache() -> sqlite3.Connection:
+    """Open (creating if needed) the on-disk embedding cache."""
+    os.makedirs(os.path.dirname(EMBED_CACHE_PATH), exist_ok=True)
+    db = sqlite3.connect(EMBED_CACHE_PATH)
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS embeddings ("
+        "model TEXT NOT NULL, hash BLOB NOT NULL, vector BLOB NOT NULL, "
+        "PRIMARY KEY (model, hash))"
+    )
+    return db
+
+
+def _vec_to_blob(vec: list[float]) -> bytes:
+    return array("f", vec).tobytes()
+
+
+def _blob_to_vec(blob: bytes) -> list[float]:
+    return list(array("f", blob))
+
+# Bulk load path: binary COPY into an unlogged staging table, then one
+# INSERT ... SELECT with the original ON CONFLICT semantics. COPY streams rows
+# in a single round-trip with binary-encoded vectors, bypassing per-row
+# parameter parsing; the staging hop is needed because COPY itself cannot
+# express ON CONFLICT DO NOTHING.
+_COPY_COLS = "source_id, kind, repo, url, title, body, labels, created_at, updated_at, embedding"
+STAGING_SQL = "CREATE UNLOGGED TABLE IF NOT EXISTS docs_staging (LIKE docs INCLUDING DEFAULTS)"
+COPY_SQL = f"COPY docs_staging ({_COPY_COLS}) FROM STDIN WITH (FORMAT BINARY)"
+MERGE_SQL = (
+    f"INSERT INTO docs ({_COPY_COLS}) SELECT {_COPY_COLS} FROM docs_staging "
+    "ON CONFLICT (source_id) DO NOTHING"
+)
+DROP_STAGING_SQL = "DROP TABLE IF EXISTS docs_staging"
+
+# Column types for the binary COPY; order matches _COPY_COLS.
+_COPY_TYPES = ["text", "text", "text", "text", "text", "text", "text[]", "timestamptz", "timestamptz", "halfvec"]
+
+
+def _parse_ts(value: str | None) -> datetime | None:
+    """Parse an ISO 8601 GitHub timestamp; binary COPY needs real datetimes."""
+    if value is None:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
 
 @dataclass(frozen=True, slots=True)
 class DocRow:
@@ -52,46 +122,104 @@ class DocRow:
     updated_at: str | None
     token_count: int = 0
 
-    def as_sql_params(self) -> tuple[Any, ...]:
-        """Return values matching the placeholder order in CREATE_SQL."""
-        # Order must match CREATE_SQL placeholders
+
+# Fetches the nine column attributes of a DocRow in one C-level call; the
+# order matches _COPY_COLS (sans embedding).
+_GET_SQL = operator.attrgetter(
+    "source_id", "kind", "repo", "url", "title", "body", "labels", "created_at", "updated_at"
+)
+
+
+@dataclass(slots=True)
+class DocBatch:
+    """Struct-of-arrays layout for one insert batch.
+
+    DocRow stays the unit the chunker hands around, but the COPY path works
+    column-wise: parallel lists avoid building two tuples per row per flush
+    and keep each column's values contiguous for the binary encoder. List
+    order matches _COPY_COLS; timestamps become datetimes because the binary
+    COPY format carries typed values, not server-parsed text.
+    """
+    source_ids: list[str] = field(default_factory=list)
+    kinds: list[str] = field(default_factory=list)
+    repos: list[str] = field(default_factory=list)
+    urls: list[str | None] = field(default_factory=list)
+    titles: list[str | None] = field(default_factory=list)
+    bodies: list[str] = field(default_factory=list)
+    labels: list[list[str]] = field(default_factory=list)
+    created_ats: list[datetime | None] = field(default_factory=list)
+    updated_ats: list[datetime | None] = field(default_factory=list)
+    embeddings: list[HalfVector] = field(default_factory=list)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[DocRow], embeddings: Sequence[list[float]]) -> DocBatch:
+        """Build a batch from rows and their aligned embedding vectors.
+
+        Raises:
+            ValueError: If `rows` and `embeddings` differ in length.
+        """
+        from pgvector import HalfVector
+
+        if len(rows) != len(embeddings):
+            raise ValueError(f"rows ({len(rows)}) and embeddings ({len(embeddings)}) differ in length")
+        if not rows:
+            return cls()
+        # attrgetter + zip transpose the rows column-wise in C instead of
+        # nine LOAD_ATTR/append pairs per row in the interpreter.
+        source_ids, kinds, repos, urls, titles, bodies, labels, created_ats, updated_ats = (
+            map(list, zip(*map(_GET_SQL, rows)))
+        )
+        return cls(
+            source_ids=source_ids,
+            kinds=kinds,
+            repos=repos,
+            urls=urls,
+            titles=titles,
+            bodies=bodies,
+            labels=labels,
+            created_ats=[_parse_ts(v) for v in created_ats],
+            updated_ats=[_parse_ts(v) for v in updated_ats],
+            embeddings=[HalfVector(e) for e in embeddings],
+        )
+
+    def columns(self) -> tuple[list, ...]:
+        """Return the parallel columns in _COPY_COLS order."""
         return (
-            self.source_id,
-            self.kind,
-            self.repo,
-            self.url,
-            self.title,
-            self.body,
+            self.source_ids,
+            self.kinds,
+            self.repos,
+            self.urls,
+            self.titles,
+            self.bodies,
             self.labels,
-            self.created_at,
-            self.updated_at,
+            self.created_ats,
+            self.updated_ats,
+            self.embeddings,
         )
 
-# Batch embeddings respecting per-request token budget
+def normalize(vec: list[float]) -> list[float]:
+    """Return `vec` scaled to unit length (unchanged if the norm is zero).
 
-def embed_rows(rows: Sequence[DocRow]) -> list[list[float]]:
-    """Embed rows in batches while honoring API token limits.
+    The docs table stores normalized vectors so queries can use the
+    inner-product operator for cosine ordering.
+    """
+    norm = math.sqrt(sum(x * x for x in vec))
+    if norm == 0.0:
+        return vec
+    return [x / norm for x in vec]
 
-    Flushes the current batch whenever adding the next input would exceed the
-    per-request aggregate token budget (PER_REQUEST_TOKEN_BUDGET). Each row is
-    assumed to already respect the per-input cap (EMBEDDING_TOKEN_LIMIT) set by
-    the embedding model.
+# Batch embeddings respecting per-request token budget
 
-    Args:
-        rows: Sequence of DocRow instances to embed. `token_count` must reflect
-            the tokenizer used by the embeddings model.
+def _split_into_sub_batches(rows: Sequence[DocRow]) -> list[list[str]]:
+    """Group row bodies into API requests under the per-request token budget.
 
-    Returns:
-        A list of embedding vectors aligned with the input `rows` order.
+    Each row is assumed to already respect the per-input cap
+    (EMBEDDING_TOKEN_LIMIT) set by the embedding model.
 
     Raises:
-        RuntimeError: If the OpenAI client is not configured.
         ValueError: If any row exceeds the per-input token limit.
     """
-    if client is None:
-        raise RuntimeError("OPENAI_API_KEY not configured")
-
-    vectors: list[list[float]] = []
+    sub_batches: list[list[str]] = []
     batch_texts: list[str] = []
     batch_tokens = 0
 
@@ -102,22 +230,271 @@ def embed_rows(rows: Sequence[DocRow]) -> list[list[float]]:
                 f"Row {row.source_id} exceeds per-input token limit: {row.token_count} > {EMBEDDING_TOKEN_LIMIT}"
             )
 
-        # Flush current batch if adding this row would exceed the per-request budget
+        # Start a new batch if adding this row would exceed the per-request budget
         if batch_texts and (batch_tokens + row.token_count > PER_REQUEST_TOKEN_BUDGET):
-            resp = client.embeddings.create(model=EMBEDDING_MODEL, input=batch_texts)
-            vectors.extend([d.embedding for d in resp.data])
-            batch_texts.clear()
+            sub_batches.append(batch_texts)
+            batch_texts = []
             batch_tokens = 0
 
         batch_texts.append(row.body)
         batch_tokens += row.token_count
 
-    # Final flush
     if batch_texts:
-        resp = client.embeddings.create(model=EMBEDDING_MODEL, input=batch_texts)
-        vectors.extend([d.embedding for d in resp.data])
+        sub_batches.append(batch_texts)
+    return sub_batches
+
+
+async def embed_rows_async(rows: Sequence[DocRow]) -> list[list[float]]:
+    """Embed rows concurrently while honoring API token limits.
+
+    Splits the rows into budget-respecting sub-batches up front, then keeps up
+    to EMBED_CONCURRENCY requests in flight; embed requests are network-bound,
+    so overlapping them collapses the serialized per-request latency. Results
+    are reassembled in submission order.
+
+    Identical chunk bodies (template footers, repeated bot comments) are
+    deduplicated by content hash before hitting the API, and unique vectors
+    are persisted to an on-disk cache keyed by (model, hash) so reruns skip
+    previously embedded text.
+
+    Args:
+        rows: Sequence of DocRow instances to embed. `token_count` must reflect
+            the tokenizer used by the embeddings model.
+
+    Returns:
+        A list of embedding vectors aligned with the input `rows` order.
+
+    Raises:
+        RuntimeError: If the OpenAI client is not configured.
+        ValueError: If any row exceeds the per-input token limit.
+    """
+    if not OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY not configured")
+    from openai import AsyncOpenAI
+
+    # Deduplicate by body hash; only the first occurrence is embedded.
+    # unique_keys mirrors unique_rows so the cache-write path below never
+    # re-hashes a body.
+    keys = [_body_key(row.body) for row in rows]
+    uniq: dict[bytes, int] = {}
+    unique_rows: list[DocRow] = []
+    unique_keys: list[bytes] = []
+    for row, key in zip(rows, keys):
+        if key not in uniq:
+            uniq[key] = len(unique_rows)
+            unique_rows.append(row)
+            unique_keys.append(key)
+
+    unique_vecs: list[list[float] | None] = [None] * len(unique_rows)
+    db = _open_embed_cache()
+    try:
+        for key, idx in uniq.items():
+            hit = db.execute(
+                "SELECT vector FROM embeddings WHERE model = ? AND hash = ?",
+                (EMBEDDING_MODEL, key),
+            ).fetchone()
+            if hit is not None:
+                unique_vecs[idx] = _blob_to_vec(hit[0])
+
+        pending = [i for i, v in enumerate(unique_vecs) if v is None]
+        if pending:
+            sub_batches = _split_into_sub_batches([unique_rows[i] for i in pending])
+            sem = asyncio.Semaphore(EMBED_CONCURRENCY)
+            # The client is created per call because its transport binds to the
+            # running event loop; embed_rows callers may each run their own loop.
+            client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+
+            async def _embed(texts: list[str]) -> list[list[float]]:
+                async with sem:
+                    resp = await client.embeddings.create(model=EMBEDDING_MODEL, input=texts)
+                    return [normalize(d.embedding) for d in resp.data]
+
+            try:
+                results = await asyncio.gather(*[_embed(sb) for sb in sub_batches])
+            finally:
+                await client.close()
+
+            # One pass over the gathered results: place each vector and build
+            # its cache row, instead of materializing an intermediate flat
+            # list and re-walking it (and re-hashing bodies) a second time.
+            cache_rows: list[tuple[str, bytes, bytes]] = []
+            fresh = chain.from_iterable(results)
+            for i, vec in zip(pending, fresh, strict=True):
+                unique_vecs[i] = vec
+                cache_rows.append((EMBEDDING_MODEL, unique_keys[i], _vec_to_blob(vec)))
+            db.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, hash, vector) VALUES (?, ?, ?)",
+                cache_rows,
+            )
+            db.commit()
+    finally:
+        db.close()
+
+    return [unique_vecs[uniq[key]] for key in keys]
+
+
+def embed_rows(rows: Sequence[DocRow]) -> list[list[float]]:
+    """Synchronous wrapper around `embed_rows_async`.
+
+    Runs its own event loop, so it stays safe to call from the insert
+    pipeline's worker threads.
+    """
+    return asyncio.run(embed_rows_async(rows))
+
+# Persistent chunk cache: closed issues rarely change between incremental
+# re-index runs, so (title, body, params) -> chunks survives in SQLite under
+# .data/chunks.db; WAL mode lets the chunking worker processes share it. A
+# small in-process dict fronts it for the current run's duplicate bodies.
+CHUNK_CACHE_PATH = os.path.join(".data", "chunks.db")
+_CHUNK_MEM_MAX = 1024
+_chunk_mem: dict[bytes, list[Chunk]] = {}
+_chunk_db: sqlite3.Connection | None = None
+
+
+def _chunk_cache_db() -> sqlite3.Connection:
+    """Return this process's connection to the on-disk chunk cache."""
+    global _chunk_db
+    if _chunk_db is None:
+        os.makedirs(os.path.dirname(CHUNK_CACHE_PATH), exist_ok=True)
+        _chunk_db = sqlite3.connect(CHUNK_CACHE_PATH)
+        _chunk_db.execute("PRAGMA journal_mode=WAL")
+        _chunk_db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks (hash BLOB PRIMARY KEY, chunks BLOB NOT NULL)"
+        )
+    return _chunk_db
+
+
+def cached_chunks(title: str, body: str, chunk_size: int, overlap_tokens: int, token_limit: int) -> list[Chunk]:
+    """create_chunks_for_document with in-process and on-disk caching.
+
+    The key hashes the title along with the body and parameters because the
+    title feeds the context prefix and per-part titles of the output.
+    """
+    h = hashlib.sha256(
+        f"{title or ''}\0{body}\0{chunk_size}\0{overlap_tokens}\0{token_limit}".encode("utf-8")
+    ).digest()
+
+    chunks = _chunk_mem.get(h)
+    if chunks is not None:
+        return chunks
+
+    db = _chunk_cache_db()
+    hit = db.execute("SELECT chunks FROM chunks WHERE hash = ?", (h,)).fetchone()
+    if hit is not None:
+        chunks = [
+            Chunk(chunk_id=v[0], text=v[1], token_count=v[2], start_sentence=v[3], end_sentence=v[4], title=v[5])
+            for v in _loads(hit[0])
+        ]
+    else:
+        chunks = create_chunks_for_document(title, body, chunk_size, overlap_tokens, token_limit)
+        blob = _dumps([
+            [c.chunk_id, c.text, c.token_count, c.start_sentence, c.end_sentence, c.title]
+            for c in chunks
+        ])
+        db.execute("INSERT OR IGNORE INTO chunks (hash, chunks) VALUES (?, ?)", (h, blob))
+        db.commit()
+
+    if len(_chunk_mem) >= _CHUNK_MEM_MAX:
+        del _chunk_mem[next(iter(_chunk_mem))]
+    _chunk_mem[h] = chunks
+    return chunks
+
+
+def iter_jsonl(path: str):
+    """Yield raw line bytes from a JSONL file via a read-only memory map.
+
+    mmap lets the OS page the file in on demand instead of buffering it
+    through Python I/O, which keeps RSS flat on multi-GB dumps; each yielded
+    bytes object is handed straight to the JSON parser.
+
+    Args:
+        path: Path to the JSONL file.
+    Yields:
+        One bytes object per non-empty line, without the trailing newline.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while (nl := mm.find(b"\n", start)) != -1:
+                if nl > start:
+                    yield mm[start:nl]
+                start = nl + 1
+            if start < len(mm):
+                yield mm[start:]
+
+
+def process_item(item: dict[str, Any], repo: str, chunk_size: int, overlap_tokens: int, token_limit: int) -> list[DocRow]:
+    """Chunk one fetched issue record (issue body plus comments) into DocRows.
+
+    Top-level so it pickles for ProcessPoolExecutor; chunking is CPU-bound
+    regex and tokenizer work, so items are fanned out across processes.
+
+    Args:
+        item: One JSONL record from fetch_github.py ({"issue": ..., "comments": ...}).
+        repo: Repository in the form "owner/name".
+        chunk_size: Target maximum tokens per chunk.
+        overlap_tokens: Approximate token overlap between chunks.
+        token_limit: Hard per-input cap for the embeddings model.
+    Returns:
+        DocRows for the issue and all its comments, in document order.
+    """
+    rows: list[DocRow] = []
+    issue = item["issue"]
+    comments = item["comments"]
+    issue_id = f"{repo}#{issue['number']}"
+    title = issue.get("title")
+    body = issue.get("body") or ""
+    url = issue.get("html_url")
+    labels = [l["name"] for l in issue.get("labels", [])]
+    created = issue.get("created_at")
+    updated = issue.get("updated_at")
+
+    chunks = cached_chunks(title, body, chunk_size, overlap_tokens, token_limit)
+    for chunk in chunks:
+        chunk_id = f"{issue_id}" if len(chunks) == 1 else f"{issue_id}/chunk{chunk.chunk_id + 1}"
+        rows.append(DocRow(
+            source_id=chunk_id,
+            kind="issue",
+            repo=repo,
+            url=url,
+            title=chunk.title,
+            body=chunk.text,
+            labels=labels,
+            created_at=created,
+            updated_at=updated,
+            token_count=chunk.token_count,
+        ))
+
+    # Process comments with chunking
+    for idx, c in enumerate(comments):
+        comment_body = c.get("body") or ""
+        curl = c.get("html_url") or url
+        ccreated = c.get("created_at")
+        cupdated = c.get("updated_at")
+
+        comment_title = f"Comment on: {title}" if title else f"Comment on issue #{issue['number']}"
+        chunks = cached_chunks(comment_title, comment_body, chunk_size, overlap_tokens, token_limit)
+        for chunk in chunks:
+            if len(chunks) == 1:
+                cid = f"{issue_id}/c{idx+1}"
+            else:
+                cid = f"{issue_id}/c{idx+1}/chunk{chunk.chunk_id + 1}"
+            rows.append(DocRow(
+                source_id=cid,
+                kind="comment",
+                repo=repo,
+                url=curl,
+                title=chunk.title,
+                body=chunk.text,
+                labels=labels,
+                created_at=ccreated,
+                updated_at=cupdated,
+                token_count=chunk.token_count,
+            ))
+    return rows
 
-    return vectors
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
@@ -129,70 +506,44 @@ if __name__ == "__main__":
 
     path = args.file or f".data/{args.repo.replace('/', '_')}_issues.jsonl"
     rows: list[DocRow] = []
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            item = json.loads(line)
-            issue = item["issue"]
-            comments = item["comments"]
-            issue_id = f"{args.repo}#{issue['number']}"
-            title = issue.get("title")
-            body = issue.get("body") or ""
-            url = issue.get("html_url")
-            labels = [l["name"] for l in issue.get("labels", [])]
-            created = issue.get("created_at")
-            updated = issue.get("updated_at")
-
-            chunks = create_chunks_for_document(title, body, args.chunk_size, args.overlap_size, EMBEDDING_TOKEN_LIMIT)
-            for chunk in chunks:
-                chunk_id = f"{issue_id}" if len(chunks) == 1 else f"{issue_id}/chunk{chunk.chunk_id + 1}"
-                rows.append(DocRow(
-                    source_id=chunk_id,
-                    kind="issue",
-                    repo=args.repo,
-                    url=url,
-                    title=chunk.title,
-                    body=chunk.text,
-                    labels=labels,
-                    created_at=created,
-                    updated_at=updated,
-                    token_count=chunk.token_count,
-                ))
-
-            # Process comments with chunking
-            for idx, c in enumerate(comments):
-                comment_body = c.get("body") or ""
-                curl = c.get("html_url") or url
-                ccreated = c.get("created_at")
-                cupdated = c.get("updated_at")
-
-                comment_title = f"Comment on: {title}" if title else f"Comment on issue #{issue['number']}"
-                chunks = create_chunks_for_document(comment_title, comment_body, args.chunk_size, args.overlap_size, EMBEDDING_TOKEN_LIMIT)
-                for chunk in chunks:
-                    if len(chunks) == 1:
-                        cid = f"{issue_id}/c{idx+1}"
-                    else:
-                        cid = f"{issue_id}/c{idx+1}/chunk{chunk.chunk_id + 1}"
-                    rows.append(DocRow(
-                        source_id=cid,
-                        kind="comment",
-                        repo=args.repo,
-                        url=curl,
-                        title=chunk.title,
-                        body=chunk.text,
-                        labels=labels,
-                        created_at=ccreated,
-                        updated_at=cupdated,
-                        token_count=chunk.token_count,
-                    ))
+    worker = partial(
+        process_item,
+        repo=args.repo,
+        chunk_size=args.chunk_size,
+        overlap_tokens=args.overlap_size,
+        token_limit=EMBEDDING_TOKEN_LIMIT,
+    )
+    # Chunking is pure-Python regex/tokenizer CPU work; fan items out across
+    # processes. map() yields results in input order, so row order matches
+    # the old serial loop.
+    items = (_loads(line) for line in iter_jsonl(path))
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        for item_rows in pool.map(worker, items, chunksize=32):
+            rows.extend(item_rows)
+
+    import psycopg
+    from pgvector.psycopg import register_vector
 
     batch_size = 256
+    batches = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
     with psycopg.connect(DATABASE_URL) as conn:
+        register_vector(conn)
         with conn.cursor() as cur:
-            for row_index in range(0, len(rows), batch_size):
-                batch_rows = rows[row_index:row_index + batch_size]
-                embs = embed_rows(batch_rows)
-                # Ensure counts match; zip(strict=True) will raise if not
-                values = [(*r.as_sql_params(), e) for r, e in zip(batch_rows, embs, strict=True)]
-                cur.executemany(CREATE_SQL, values)
+            cur.execute(STAGING_SQL)
+            # Embedding a batch is seconds of network wait during which the DB
+            # sits idle; a small thread pool keeps a few embed requests in
+            # flight while the main thread streams finished batches into COPY.
+            # Results are consumed in submission order so rows land in the
+            # same order as the serial loop did.
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                futures = [pool.submit(embed_rows, b) for b in batches]
+                for batch_rows, fut in zip(batches, futures):
+                    batch = DocBatch.from_rows(batch_rows, fut.result())
+                    with cur.copy(COPY_SQL) as cp:
+                        cp.set_types(_COPY_TYPES)
+                        for values in zip(*batch.columns()):
+                            cp.write_row(values)
+            cur.execute(MERGE_SQL)
+            cur.execute(DROP_STAGING_SQL)
         conn.commit()
     print(f"Indexed {len(rows)} rows for {args.repo}")
\ No newline at end of file
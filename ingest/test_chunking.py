@@ -0,0 +1,143 @@
+"""Pytest suite for the sentence-aware chunker.
+
+Run from this directory (the ingest scripts import each other flat):
+    cd ingest && python -m pytest test_chunking.py -q
+"""
+from dataclasses import replace
+from functools import lru_cache
+
+import pytest
+
+from chunker import (
+    Chunk,
+    chunk_text,
+    create_chunks_for_document,
+    enforce_hard_cap,
+    pack_sentences_into_chunks,
+    sentence_token_counts,
+    split_into_paragraphs,
+    split_paragraph_into_sentences,
+    split_text_into_sentences,
+)
+
+SHORT_TEXT = "This is a short issue body. It has two sentences."
+
+LONG_TEXT = "\n\n".join(
+    f"Paragraph {i} reports a failure in the scheduler. "
+    "The worker crashes when the queue drains under load. "
+    "A reproduction script and full traceback are attached below. "
+    "Downgrading to the previous release makes the crash disappear."
+    for i in range(1, 41)
+)
+
+# Split and tokenized once at import; the packing tests below take the
+# precomputed arrays so they exercise pure chunk-boundary logic instead of
+# re-paying the sentence scan and tiktoken encode per test.
+LONG_SENTENCES = split_text_into_sentences(LONG_TEXT)
+LONG_TOKENS = sentence_token_counts(LONG_SENTENCES)
+
+
+@lru_cache(maxsize=128)
+def _chunk_long_cached(max_tokens: int, overlap_tokens: int) -> tuple[Chunk, ...]:
+    return tuple(
+        pack_sentences_into_chunks(
+            LONG_SENTENCES, max_tokens=max_tokens, overlap_tokens=overlap_tokens, toks=LONG_TOKENS
+        )
+    )
+
+
+def chunk_long(max_tokens: int, overlap_tokens: int) -> list[Chunk]:
+    """Chunk LONG_TEXT once per parameter pair and hand out fresh copies.
+
+    Several tests chunk the same text with the same parameters; the memo
+    skips the repeated packing work, and `replace` copies keep the cached
+    chunks immutable in practice — a test mutating its chunks cannot
+    poison a later test's view of the same cache entry.
+    """
+    return [replace(c) for c in _chunk_long_cached(max_tokens, overlap_tokens)]
+
+
+def test_split_into_paragraphs_drops_blanks():
+    paragraphs = split_into_paragraphs("first\r\n\r\nsecond\n\n\n\nthird\n\n")
+    assert paragraphs == ["first", "second", "third"]
+
+
+def test_split_paragraph_into_sentences_keeps_trailing_quote():
+    sentences = split_paragraph_into_sentences('He said "stop." Then it crashed.')
+    assert sentences == ['He said "stop."', "Then it crashed."]
+
+
+def test_split_text_into_sentences_spans_paragraphs():
+    sentences = split_text_into_sentences("One here. Two here.\n\nThree here.")
+    assert sentences == ["One here.", "Two here.", "Three here."]
+
+
+@pytest.mark.parametrize(
+    ("text", "max_tokens", "overlap", "expected_min_chunks"),
+    [
+        (SHORT_TEXT, 100, 0, 1),
+        (SHORT_TEXT, 100, 20, 1),
+        (LONG_TEXT, 100, 0, 2),
+        (LONG_TEXT, 100, 20, 2),
+        (LONG_TEXT, 600, 100, 1),
+    ],
+)
+def test_chunk_text_chunk_counts(text, max_tokens, overlap, expected_min_chunks):
+    chunks = chunk_text(text, max_tokens=max_tokens, overlap_tokens=overlap)
+    assert len(chunks) >= expected_min_chunks
+    assert all(isinstance(c, Chunk) for c in chunks)
+    assert [c.chunk_id for c in chunks] == list(range(len(chunks)))
+
+
+def test_chunk_text_short_input_is_single_chunk():
+    chunks = chunk_text(SHORT_TEXT, max_tokens=100, overlap_tokens=0)
+    assert len(chunks) == 1
+    assert chunks[0].text == SHORT_TEXT
+
+
+def test_pack_respects_soft_cap():
+    chunks = chunk_long(max_tokens=80, overlap_tokens=0)
+    # Multi-sentence chunks must stay under the soft cap; only a chunk that
+    # is a single oversize sentence may exceed it.
+    for c in chunks:
+        if c.end_sentence > c.start_sentence:
+            assert c.token_count <= 80
+
+
+def test_pack_overlap_repeats_sentences():
+    chunks = chunk_long(max_tokens=100, overlap_tokens=30)
+    assert len(chunks) >= 2
+    for prev, cur in zip(chunks, chunks[1:]):
+        assert cur.start_sentence <= prev.end_sentence + 1
+        assert cur.start_sentence > prev.start_sentence
+
+
+@pytest.mark.parametrize("bad_kwargs", [{"max_tokens": 0}, {"overlap_tokens": -1}])
+def test_pack_rejects_bad_parameters(bad_kwargs):
+    with pytest.raises(ValueError):
+        pack_sentences_into_chunks(["One sentence."], **{"max_tokens": 10, "overlap_tokens": 0, **bad_kwargs})
+
+
+def test_enforce_hard_cap_splits_oversize_chunks():
+    chunks = chunk_long(max_tokens=5000, overlap_tokens=0)
+    capped = enforce_hard_cap(chunks, cap=100)
+    assert len(capped) >= len(chunks)
+    assert [c.chunk_id for c in capped] == list(range(len(capped)))
+    for c in capped:
+        if c.end_sentence > c.start_sentence:
+            assert c.token_count <= 100
+
+
+def test_create_chunks_for_document_empty_body_uses_title():
+    chunks = create_chunks_for_document("A title", "", 500, 100, 8192)
+    assert len(chunks) == 1
+    assert chunks[0].text == "A title"
+
+
+def test_create_chunks_for_document_multipart_titles():
+    chunks = create_chunks_for_document("Scheduler bug", LONG_TEXT, 100, 20, 8192)
+    assert len(chunks) > 1
+    total = len(chunks)
+    for i, c in enumerate(chunks, start=1):
+        assert c.title == f"Scheduler bug (part {i}/{total})"
+        assert c.text.startswith("Title: Scheduler bug")
@@ -12,11 +12,19 @@ CREATE TABLE IF NOT EXISTS docs (
   labels TEXT[],
   created_at TIMESTAMPTZ,
   updated_at TIMESTAMPTZ,
-  embedding vector(1536)               -- adjust if you change models
+  embedding halfvec(1536)              -- fp16 storage; adjust dim if you change models
 );
 
 CREATE INDEX IF NOT EXISTS idx_docs_repo ON docs(repo);
 CREATE INDEX IF NOT EXISTS idx_docs_labels ON docs USING GIN(labels);
 CREATE INDEX IF NOT EXISTS idx_docs_source_id ON docs(source_id);
--- IVF Flat index for ANN. Tune lists per dataset size.
-CREATE INDEX IF NOT EXISTS idx_docs_embedding ON docs USING ivfflat (embedding vector_l2_ops) WITH (lists = 100);
\ No newline at end of file
+-- HNSW index for ANN. Recall/latency is tuned per query via hnsw.ef_search.
+-- halfvec (fp16, pgvector 0.7+) halves the bytes touched per distance
+-- computation at negligible recall cost for OpenAI embeddings.
+-- Existing databases created with the previous fp32 column should run:
+--   DROP INDEX IF EXISTS idx_docs_embedding;
+--   ALTER TABLE docs ALTER COLUMN embedding TYPE halfvec(1536) USING embedding::halfvec(1536);
+-- before re-applying this file.
+-- Vectors are normalized at ingest and query time, so inner product (<#>)
+-- gives cosine ordering with one less sqrt/sub per distance than L2.
+CREATE INDEX IF NOT EXISTS idx_docs_embedding ON docs USING hnsw (embedding halfvec_ip_ops) WITH (m = 16, ef_construction = 64);
\ No newline at end of file
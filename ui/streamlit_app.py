@@ -1,57 +1,231 @@
-import os, httpx, streamlit as st
-API = os.getenv("API_URL", "http://api:8000")
+import asyncio, json, os, threading, time, httpx, streamlit as st
+
+# orjson decodes response bytes directly in C, skipping the stdlib tokenizer
+# and the extra str decode r.json() would do; fall back to stdlib if absent.
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+
+# Sent alongside content=_dumps(...); the json= kwarg would set this itself
+# but also force stdlib encoding inside httpx.
+_JSON_HEADERS = {"content-type": "application/json"}
 
 st.set_page_config(page_title="Issue Triage Copilot", layout="wide")
 
+
+@st.cache_resource
+def config() -> dict:
+    """Environment-derived settings, resolved once per Streamlit process.
+
+    Module-top getenv calls rerun on every script execution; cache_resource
+    amortizes them (and any future, pricier config work) across reruns.
+    """
+    return {"api": os.getenv("API_URL", "http://api:8000")}
+
+
+@st.cache_resource
+def get_client() -> httpx.Client:
+    """Shared API client, created once per Streamlit process.
+
+    Streamlit reruns this script on every interaction; opening a client per
+    click paid TCP+TLS setup each time. cache_resource keeps one pooled
+    client so requests reuse kept-alive connections, and HTTP/2 lets the
+    search/triage/qa calls multiplex over a single connection.
+    """
+    return httpx.Client(
+        base_url=config()["api"],
+        timeout=30.0,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+    )
+
+# Streamlit reruns the whole script on any widget change; cache_data memoizes
+# each call on its arguments so repeat queries skip the network round-trip and
+# the server-side embedding + vector search entirely.
+@st.cache_data(ttl=300, max_entries=256)
+def do_search(q: str, repo: str | None) -> list[dict]:
+    r = get_client().get("/search/", params={"q": q, "repo": repo})
+    r.raise_for_status()
+    return _loads(r.content)["items"]
+
+
+async def _fetch_triage(title: str, body: str, repo: str | None) -> tuple[dict, list[dict]]:
+    """Run the triage call and a title search concurrently.
+
+    The two requests are independent, so gathering them costs the slower of
+    the two instead of the sum. The async client is scoped to this call
+    because its transport binds to the event loop asyncio.run creates.
+    """
+    async with httpx.AsyncClient(base_url=config()["api"], http2=True, timeout=30.0) as c:
+        tr, sr = await asyncio.gather(
+            c.post(
+                "/triage/",
+                content=_dumps({"title": title, "body": body, "repo": repo}),
+                headers=_JSON_HEADERS,
+            ),
+            c.get("/search/", params={"q": title or body, "repo": repo}),
+        )
+    tr.raise_for_status()
+    sr.raise_for_status()
+    return _loads(tr.content), _loads(sr.content)["items"]
+
+
+@st.cache_data(ttl=300, max_entries=256)
+def do_triage(title: str, body: str, repo: str | None) -> tuple[dict, list[dict]]:
+    return asyncio.run(_fetch_triage(title, body, repo))
+
+
+@st.cache_data(ttl=300, max_entries=256)
+def do_triage_only(title: str, body: str, repo: str | None) -> dict:
+    """Triage call alone, for when the related-issues search was prefetched."""
+    r = get_client().post(
+        "/triage/",
+        content=_dumps({"title": title, "body": body, "repo": repo}),
+        headers=_JSON_HEADERS,
+    )
+    r.raise_for_status()
+    return _loads(r.content)
+
+
+def _prefetch_related(holder: dict, title: str, repo: str | None, api: str) -> None:
+    """Warm the related-issues search while the user is still typing.
+
+    Runs in a daemon thread with no Streamlit script context, so it talks
+    plain httpx and writes into `holder` (a dict shared via session_state)
+    instead of calling any st.* API; the API base URL is passed in for the
+    same reason. Sleeping first debounces: if the title has changed again by
+    the time we wake, a newer thread owns the prefetch and this one bails out.
+    """
+    time.sleep(0.8)
+    if holder.get("title") != title:
+        return
+    try:
+        r = httpx.get(f"{api}/search/", params={"q": title, "repo": repo}, timeout=30.0)
+        r.raise_for_status()
+        holder[("results", title, repo)] = _loads(r.content)["items"]
+    except httpx.HTTPError:
+        pass  # best effort; the submit path fetches normally on a miss
+
+
+def stream_qa(question: str, repo: str | None, citations: list[str]):
+    """Yield answer deltas from the /qa/stream SSE endpoint as they arrive.
+
+    The server sends one `citations` event up front, unnamed `data` frames
+    carrying answer deltas, and a final `done` event. Citation URLs are
+    appended to the caller's `citations` list as a side channel so the
+    generator can feed st.write_stream directly.
+    """
+    with get_client().stream(
+        "POST",
+        "/qa/stream",
+        content=_dumps({"question": question, "repo": repo}),
+        headers=_JSON_HEADERS,
+    ) as r:
+        r.raise_for_status()
+        event = None
+        for line in r.iter_lines():
+            if not line:
+                event = None  # blank line ends the current SSE frame
+            elif line.startswith("event: "):
+                event = line[7:].strip()
+            elif line.startswith("data: "):
+                data = _loads(line[6:])
+                if event == "citations":
+                    citations.extend(data.get("citations", []))
+                elif event == "done":
+                    break
+                elif data.get("delta"):
+                    yield data["delta"]
+
+
 st.title("Issue Triage Copilot")
 
+# Each section sits in a form so typing in the inputs does not rerun the
+# script per keystroke; widget state is batched and delivered on submit.
 st.header("Semantic Search")
-q = st.text_input("Query")
-repo = st.text_input("Repo filter (owner/name)")
-if st.button("Search") and q:
-    with httpx.Client() as c:
-        r = c.get(f"{API}/search/", params={"q": q, "repo": repo or None})
-        r.raise_for_status()
-        data = r.json()["items"]
-        for item in data:
-            st.write(f"**{item['title'] or '(no title)'}** — {item['repo']}  ")
-            st.write(item["snippet"])
-            st.write(item["url"])
-            st.write(f"score: {item['score']:.4f}")
-            st.divider()
+with st.form("search_form"):
+    q = st.text_input("Query")
+    repo = st.text_input("Repo filter (owner/name)")
+    search_submitted = st.form_submit_button("Search")
+if search_submitted and q:
+    data = do_search(q, repo or None)
+    # One Arrow table in a single websocket message, rendered with
+    # virtualized scrolling — stays fast even for very long result lists.
+    if data:
+        # Imported on first render rather than at module top: pandas is the
+        # heaviest import here and nothing before this point needs it.
+        import pandas as pd
+
+        # snippet_preview is pre-truncated by the API, so no per-item slicing
+        # happens here and the Arrow payload stays small on long result lists.
+        df = pd.DataFrame(data)[["title", "repo", "snippet_preview", "score", "url"]]
+        st.dataframe(
+            df,
+            hide_index=True,
+            column_config={
+                "url": st.column_config.LinkColumn("url"),
+                "score": st.column_config.NumberColumn(format="%.4f"),
+            },
+        )
+    else:
+        st.caption("No results.")
 
 st.header("New Issue Triage")
-col1, col2 = st.columns(2)
-with col1:
-    t = st.text_input("Issue title")
-with col2:
+if "prefetch" not in st.session_state:
+    st.session_state.prefetch = {}
+prefetch = st.session_state.prefetch
+# The title input sits outside the form on purpose: its keystroke reruns are
+# the trigger for prefetching the related-issues search, so the result is
+# usually cached by the time the user finishes the body and clicks submit.
+t = st.text_input("Issue title", key="triage_title")
+if t and prefetch.get("title") != t:
+    prefetch["title"] = t
+    threading.Thread(target=_prefetch_related, args=(prefetch, t, None, config()["api"]), daemon=True).start()
+with st.form("triage_form"):
     b = st.text_area("Issue body")
-repo2 = st.text_input("Repo (optional)", key="repo2")
-if st.button("Suggest Duplicates") and (t or b):
-    with httpx.Client() as c:
-        r = c.post(f"{API}/triage/", json={"title": t, "body": b, "repo": repo2 or None})
-        r.raise_for_status()
-        data = r.json()
-        st.subheader("Candidates")
-        for cnd in data["candidates"]:
-            st.write(f"**{cnd['title'] or '(no title)'}**  ")
-            st.write(cnd["snippet"])
-            st.write(cnd["url"])
-            st.write(f"score: {cnd['score']:.4f}")
-            st.divider()
-        st.subheader("Draft Reply")
-        st.write(data["draft_reply"])
+    repo2 = st.text_input("Repo (optional)", key="repo2")
+    triage_submitted = st.form_submit_button("Suggest Duplicates")
+if triage_submitted and (t or b):
+    related = prefetch.get(("results", t, repo2 or None))
+    if related is not None:
+        data = do_triage_only(t, b, repo2 or None)
+    else:
+        data, related = do_triage(t, b, repo2 or None)
+    st.subheader("Candidates")
+    if data["candidates"]:
+        import pandas as pd
+
+        df = pd.DataFrame(data["candidates"])[["title", "snippet_preview", "score", "url"]]
+        st.dataframe(
+            df,
+            hide_index=True,
+            column_config={
+                "url": st.column_config.LinkColumn("url"),
+                "score": st.column_config.NumberColumn(format="%.4f"),
+            },
+        )
+    else:
+        st.caption("No candidates found.")
+    st.subheader("Draft Reply")
+    st.write(data["draft_reply"])
+    if related:
+        st.subheader("Related issues (title search)")
+        st.markdown("\n".join(f"- **{item['title'] or '(no title)'}** — {item['url']}" for item in related))
 
 st.header("Q&A")
-q2 = st.text_input("Your question", key="q2")
-repo3 = st.text_input("Repo (optional)", key="repo3")
-if st.button("Ask") and q2:
-    with httpx.Client() as c:
-        r = c.post(f"{API}/qa/", json={"question": q2, "repo": repo3 or None})
-        r.raise_for_status()
-        data = r.json()
-        st.write(data["answer"])
-        if data.get("citations"):
-            st.write("Citations:")
-            for i, u in enumerate(data["citations"], start=1):
-                st.write(f"[{i}] {u}")
\ No newline at end of file
+with st.form("qa_form"):
+    q2 = st.text_input("Your question", key="q2")
+    repo3 = st.text_input("Repo (optional)", key="repo3")
+    qa_submitted = st.form_submit_button("Ask")
+if qa_submitted and q2:
+    citations: list[str] = []
+    st.write_stream(stream_qa(q2, repo3 or None, citations))
+    if citations:
+        st.markdown("Citations:\n\n" + "\n".join(f"[{i}] {u}  " for i, u in enumerate(citations, start=1)))
\ No newline at end of file